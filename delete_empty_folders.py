@@ -1,8 +1,16 @@
+import concurrent.futures
+import dataclasses
+import errno
 import logging
+import logging.handlers
 import os
 import pathlib
+import queue
+import re
 import socket
+import stat
 import sys
+import threading
 import time
 import toml
 import traceback
@@ -20,6 +28,23 @@ Deletes empty folders in the specified directory tree.
 
 __version__ = "1.1.3"  # Major.Minor.Patch
 
+PARALLEL_SUBDIR_THRESHOLD = 4  # Dirs with more subdirs than this have their subtrees scanned in parallel
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class Config:
+    """
+    Settings loaded from the TOML config file, with the ignore rules already compiled.
+    """
+    paths_to_scan: typing.Tuple[str, ...]
+    ignore_these_exact_paths: typing.FrozenSet[str]  # Casefolded
+    any_part_of_path_to_ignore: typing.Union[typing.Pattern, None]
+    trust_directory_link_count: bool = False
+    scan_workers: int = 0
+    batch_trash: bool = True
+    use_trash: bool = True
+    logging: dict = dataclasses.field(default_factory=dict, compare=False, hash=False)
+
 
 def read_toml(file_path: typing.Union[str, pathlib.Path]) -> dict:
     """
@@ -32,63 +57,377 @@ def read_toml(file_path: typing.Union[str, pathlib.Path]) -> dict:
     return config
 
 
-def path_is_ignored(path: str, ignore_these_exact_paths: typing.List[str], any_part_of_path_to_ignore: typing.List[str]) -> bool:
-    if path.lower() in [ignore.lower() for ignore in ignore_these_exact_paths]:
-        logger.debug(f"Path is explicitly ignored.")
-        return True
-    if any(part_of_path_to_ignore.lower() in path.lower() for part_of_path_to_ignore in any_part_of_path_to_ignore):
-        logger.debug(f"Path contains an ignored part.")
+def compile_ignore_parts(any_part_of_path_to_ignore: typing.Iterable[str]) -> typing.Union[typing.Pattern, None]:
+    """
+    Compile the parts of paths to ignore into a single case-insensitive pattern, or None if there are none.
+    """
+    parts = [re.escape(part) for part in any_part_of_path_to_ignore if part]
+    if not parts:
+        return None
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+def default_scan_workers() -> int:
+    """
+    Scanning waits on I/O rather than the CPU, so use more threads than cores by default.
+    """
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class _IgnoreRules:
+    ignore_these_exact_paths: typing.FrozenSet[str]
+    ignore_these_exact_names: typing.FrozenSet[str]  # Last component of each exact path, casefolded
+    any_part_of_path_to_ignore: typing.Union[typing.Pattern, None]
+
+
+def _ignore_rules(
+        ignore_these_exact_paths: typing.FrozenSet[str],
+        any_part_of_path_to_ignore: typing.Union[typing.Pattern, None]
+) -> _IgnoreRules:
+    ignore_these_exact_names = frozenset(os.path.basename(path) for path in ignore_these_exact_paths)
+    return _IgnoreRules(ignore_these_exact_paths, ignore_these_exact_names, any_part_of_path_to_ignore)
+
+
+def _check_entry(entry: os.DirEntry, rules: _IgnoreRules) -> typing.Tuple[bool, bool]:
+    """
+    Classify a scandir entry for the emptiness check. Returns (is_content, descend):
+    files, symlinks and junctions are content and never followed,
+    dirs whose name matches an ignored part are content and pruned,
+    explicitly ignored dirs are content but still descended into so their subdirs can be cleaned.
+    """
+    if not entry.is_dir(follow_symlinks=False) or _is_link(entry):
+        return True, False
+    if rules.any_part_of_path_to_ignore is not None and rules.any_part_of_path_to_ignore.search(entry.name) is not None:
+        return True, False
+    if _is_exact_ignored(entry.name, entry.path, rules):
+        return True, True
+    return False, True
+
+
+def _is_exact_ignored(name: str, path: str, rules: _IgnoreRules) -> bool:
+    # Only casefold the whole path when the dir's own name could match an exact path
+    return (
+        bool(rules.ignore_these_exact_paths)
+        and name.casefold() in rules.ignore_these_exact_names
+        and path.casefold() in rules.ignore_these_exact_paths
+    )
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class _WalkOptions:
+    ignore_rules: _IgnoreRules
+    trust_link_count: bool
+    executor: typing.Union[concurrent.futures.ThreadPoolExecutor, None]
+    work_slots: typing.Union[threading.Semaphore, None]
+
+
+def walk_post(
+        root: str,
+        ignore_these_exact_paths: typing.FrozenSet[str] = frozenset(),
+        any_part_of_path_to_ignore: typing.Union[typing.Pattern, None] = None,
+        trust_link_count: bool = False,
+        executor: typing.Union[concurrent.futures.ThreadPoolExecutor, None] = None,
+        work_slots: typing.Union[threading.Semaphore, None] = None
+) -> typing.Iterator[typing.Tuple[str, bool]]:
+    """
+    Walk the directory tree below root bottom-up, reading each directory exactly once with os.scandir.
+    Yields (dir_path, has_content) where has_content is True if the dir contains a file anywhere below it.
+    Dirs that cannot be read or are ignored are reported as having content so they and their parents are never deleted.
+    Dirs whose name matches any_part_of_path_to_ignore are pruned without being read. If root itself matches, nothing below it is read.
+    If trust_link_count is True, dirs with st_nlink == 2 are treated as leaves and only peeked at.
+    If an executor is given, subtrees of root and of dirs with many subdirs are scanned on it while work_slots allow.
+    Without work_slots, the queue is bounded as for a pool of default_scan_workers() threads.
+    """
+    if any_part_of_path_to_ignore is not None and any_part_of_path_to_ignore.search(root) is not None:
+        logger.info("Skipping ignored scan root '%s'", root)
+        return iter([(root, True)])
+    if executor is not None and work_slots is None:
+        work_slots = threading.BoundedSemaphore(default_scan_workers() * 4)
+    options = _WalkOptions(
+        _ignore_rules(ignore_these_exact_paths, any_part_of_path_to_ignore),
+        trust_link_count,
+        executor,
+        work_slots
+    )
+    return _walk_post(root, None, options)
+
+
+def _walk_post(path: str, dir_entry: typing.Union[os.DirEntry, None], options: _WalkOptions) -> typing.Iterator[typing.Tuple[str, bool]]:
+    # Each frame is [dir_path, pending_subdirs, has_content]. A pending subdir is either a DirEntry
+    # still to be scanned here or a (future, DirEntry) pair for a subtree scanned on the executor.
+    stack = [_open_frame(path, dir_entry, options)]
+    while stack:
+        frame = stack[-1]
+        if frame[1]:
+            subdir = frame[1].pop()
+            if isinstance(subdir, tuple):
+                future, subdir = subdir
+                if not future.cancel():
+                    results = future.result()
+                    yield from results
+                    if results[-1][1]:
+                        frame[2] = True
+                    continue
+                # Not started yet, scan it here instead of waiting on a busy pool
+                options.work_slots.release()
+            stack.append(_open_frame(subdir.path, subdir, options))
+            continue
+        stack.pop()
+        dir_path, _, has_content = frame
+        if has_content and stack:
+            stack[-1][2] = True
+        yield dir_path, has_content
+
+
+def _walk_subtree(dir_entry: os.DirEntry, options: _WalkOptions) -> typing.List[typing.Tuple[str, bool]]:
+    try:
+        return list(_walk_post(dir_entry.path, dir_entry, options))
+    finally:
+        options.work_slots.release()
+
+
+def _open_frame(path: str, dir_entry: typing.Union[os.DirEntry, None], options: _WalkOptions) -> list:
+    subdirs, has_content = _scan_dir(path, dir_entry, options)
+    if dir_entry is not None and _is_exact_ignored(dir_entry.name, path, options.ignore_rules):
+        # Counted as content by the parent's scan; the dir itself must never be deleted either
+        has_content = True
+    # Every subtree directly below the scan root is worth its own task
+    if options.executor is not None and (dir_entry is None or len(subdirs) > PARALLEL_SUBDIR_THRESHOLD):
+        for i, subdir in enumerate(subdirs):
+            if not options.work_slots.acquire(blocking=False):
+                break
+            future = options.executor.submit(_walk_subtree, subdir, options)
+            subdirs[i] = (future, subdir)
+    return [path, subdirs, has_content]
+
+
+def _scan_dir(path: str, dir_entry: typing.Union[os.DirEntry, None], options: _WalkOptions) -> typing.Tuple[typing.List[os.DirEntry], bool]:
+    subdirs = []
+    has_content = False
+    try:
+        # On POSIX filesystems a dir's link count is 2 + its number of subdirs,
+        # so a leaf only needs a single entry read to know if it is empty.
+        if options.trust_link_count:
+            dir_stat = dir_entry.stat(follow_symlinks=False) if dir_entry is not None else os.stat(path, follow_symlinks=False)
+            is_leaf = dir_stat.st_nlink == 2
+        else:
+            is_leaf = False
+        with os.scandir(path) as entries:
+            if is_leaf:
+                return [], next(entries, None) is not None
+            for entry in entries:
+                is_content, descend = _check_entry(entry, options.ignore_rules)
+                if is_content:
+                    has_content = True
+                    if entry.is_dir(follow_symlinks=False) and not _is_link(entry):
+                        logger.debug("%s ignored dir '%s'", "Keeping" if descend else "Skipping", entry.path)
+                if descend:
+                    subdirs.append(entry)
+    except OSError as e:
+        logger.warning("Failed to scan '%s': %s", path, e)
+        return [], True
+    if os.name == "posix":
+        # d_ino comes with the dirent, so this is free. Sorted descending because
+        # the walk pops pending subdirs from the end, visiting them in inode order.
+        subdirs.sort(key=os.DirEntry.inode, reverse=True)
+    return subdirs, has_content
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    if entry.is_symlink():
         return True
-    logger.debug(f"Path is not explicitly ignored and contains no ignored parts.")
+    # Junctions are not symlinks but still point into another tree. The reparse tag comes
+    # from the directory listing on Windows, so this needs no extra syscall.
+    return os.name == "nt" and entry.stat(follow_symlinks=False).st_reparse_tag == stat.IO_REPARSE_TAG_MOUNT_POINT
+
+
+def dir_has_content(
+        path: str,
+        ignore_these_exact_paths: typing.FrozenSet[str] = frozenset(),
+        any_part_of_path_to_ignore: typing.Union[typing.Pattern, None] = None
+) -> bool:
+    """
+    Check if a dir contains a file, symlink, junction or ignored dir anywhere below it, applying the same rules as walk_post.
+    Stops at the first one found. Subdirs that vanish while checking are treated as gone.
+    Raises OSError (FileNotFoundError if path itself is gone) when a dir cannot be read.
+    """
+    rules = _ignore_rules(ignore_these_exact_paths, any_part_of_path_to_ignore)
+    stack = [path]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if _check_entry(entry, rules)[0]:
+                        return True
+                    stack.append(entry.path)
+        except FileNotFoundError:
+            if dir_path == path:
+                raise
     return False
 
 
-def dir_is_empty(path) -> bool:
-    if not os.path.isdir(path):
-        logger.debug(f"Path is not a directory")
-        return False
-    for _, _, files in os.walk(path):
-        if files:
-            logger.debug(f"Dir is not empty")
-            return False
-    logger.debug(f"Dir is empty")
-    return True
+def trash_dirs(
+        dir_paths: typing.List[str],
+        batch: bool = True,
+        ignore_these_exact_paths: typing.FrozenSet[str] = frozenset(),
+        any_part_of_path_to_ignore: typing.Union[typing.Pattern, None] = None
+) -> typing.List[str]:
+    """
+    Send dirs to the trash, in a single send2trash call if batch is True.
+    Each dir is checked again right before trashing and skipped if something was written to it since the scan.
+    If the batch fails, the remaining dirs are retried one at a time so each failure is reported.
+    Returns the dirs that were trashed.
+    """
+    still_empty_dirs = []
+    for dir_path in dir_paths:
+        try:
+            if dir_has_content(dir_path, ignore_these_exact_paths, any_part_of_path_to_ignore):
+                logger.info("Skipping '%s', it is no longer empty", dir_path)
+                continue
+        except FileNotFoundError:
+            logger.info("Skipping '%s', it no longer exists", dir_path)
+            continue
+        except OSError as e:
+            logger.warning("Skipping '%s', it could not be checked: %s", dir_path, e)
+            continue
+        still_empty_dirs.append(dir_path)
+    dir_paths = still_empty_dirs
+
+    if batch and len(dir_paths) > 1:
+        try:
+            send2trash(dir_paths)
+            for dir_path in dir_paths:
+                logger.debug("Deleted '%s'", dir_path)
+            return list(dir_paths)
+        except Exception as e:
+            logger.warning("Batch delete failed, retrying dirs one at a time: %s", e)
+    trashed_dirs = []
+    for dir_path in dir_paths:
+        if not os.path.isdir(dir_path):
+            # Already trashed by a batch that failed part way through
+            trashed_dirs.append(dir_path)
+            logger.debug("Deleted '%s'", dir_path)
+            continue
+        try:
+            send2trash(dir_path)
+            trashed_dirs.append(dir_path)
+            logger.debug("Deleted '%s'", dir_path)
+        except Exception:
+            logger.exception("Failed to delete '%s'", dir_path)
+    return trashed_dirs
+
+
+def _outermost_empty_dir(dir_path: str, empty_dirs: typing.Set[str]) -> str:
+    parent = os.path.dirname(dir_path)
+    while parent in empty_dirs:
+        dir_path, parent = parent, os.path.dirname(parent)
+    return dir_path
+
+
+def remove_dirs(dir_paths: typing.List[str]) -> typing.List[str]:
+    """
+    Permanently remove empty dirs with os.rmdir, bypassing the trash.
+    dir_paths must list subdirs before their parents, as walk_post yields them.
+    Parents of a dir that could not be removed are skipped without trying.
+    Returns the dirs that were removed.
+    """
+    removed_dirs = []
+    # Parents of dirs that could not be removed, which cannot be empty either
+    blocked_dirs = set()
+    for dir_path in dir_paths:
+        if dir_path in blocked_dirs:
+            blocked_dirs.add(os.path.dirname(dir_path))
+            continue
+        try:
+            os.rmdir(dir_path)
+            removed_dirs.append(dir_path)
+            logger.debug("Deleted '%s'", dir_path)
+        except OSError as e:
+            blocked_dirs.add(os.path.dirname(dir_path))
+            if e.errno == errno.ENOTEMPTY:
+                logger.info("Skipping '%s', it is no longer empty", dir_path)
+            else:
+                logger.exception("Failed to delete '%s'", dir_path)
+    return removed_dirs
 
 
 def main():
-    paths_to_scan = [os.path.abspath(os.path.join(os.getcwd(), path)) for path in config["paths_to_scan"]]
+    paths_to_scan = [os.path.abspath(path) for path in config.paths_to_scan]
     logger.debug(f"{paths_to_scan=}")
-    ignore_these_exact_paths = list(config["ignore_these_exact_paths"])
+    ignore_these_exact_paths = config.ignore_these_exact_paths
     logger.debug(f"{ignore_these_exact_paths=}")
-    any_part_of_path_to_ignore = list(config["any_part_of_path_to_ignore"])
+    any_part_of_path_to_ignore = config.any_part_of_path_to_ignore
     logger.debug(f"{any_part_of_path_to_ignore=}")
+    trust_link_count = os.name == "posix" and config.trust_directory_link_count
+    logger.debug(f"{trust_link_count=}")
+    scan_workers = config.scan_workers or default_scan_workers()
+    logger.debug(f"{scan_workers=}")
 
     deleted_dirs_count = 0
-    deleted_dirs_list = []
-    for path_to_scan in paths_to_scan:
-        logger.info(f"Deleting empty dirs in '{path_to_scan}'...")
-
-        for root, dirs, _ in os.walk(path_to_scan, topdown=False):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                logger.debug(f"Scanning '{dir_path}'")
-                if path_is_ignored(dir_path, ignore_these_exact_paths, any_part_of_path_to_ignore):
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=scan_workers) if scan_workers > 1 else None
+    # Bounds how many subtree scans can be queued on the executor at once
+    work_slots = threading.BoundedSemaphore(scan_workers * 4)
+    try:
+        for path_to_scan in paths_to_scan:
+            logger.info(f"Deleting empty dirs in '{path_to_scan}'...")
+
+            empty_dirs = []
+            for dir_path, has_content in walk_post(
+                path_to_scan,
+                ignore_these_exact_paths,
+                any_part_of_path_to_ignore,
+                trust_link_count,
+                executor,
+                work_slots
+            ):
+                if dir_path == path_to_scan:
                     continue
-                if not dir_is_empty(dir_path):
+                if has_content:
                     continue
-                try:
-                    send2trash(dir_path)
-                    deleted_dirs_count += 1
-                    deleted_dirs_list.append(dir_path)
-                    logger.info(f"Deleted '{dir_path}'")
-                except Exception as e:
-                    logger.error(f"Failed to delete '{dir_path}': {e}")
-                    logger.error(traceback.format_exc())
+                empty_dirs.append(dir_path)
+
+            if config.use_trash:
+                # Trashing the outermost empty dir takes all of its empty subdirs with it
+                empty_dirs_set = set(empty_dirs)
+                outermost_empty_dirs = [dir_path for dir_path in empty_dirs if os.path.dirname(dir_path) not in empty_dirs_set]
+                trashed_dirs = set(trash_dirs(
+                    outermost_empty_dirs,
+                    config.batch_trash,
+                    ignore_these_exact_paths,
+                    any_part_of_path_to_ignore
+                ))
+                deleted_dirs = []
+                for dir_path in empty_dirs:
+                    outermost_dir = _outermost_empty_dir(dir_path, empty_dirs_set)
+                    if outermost_dir not in trashed_dirs:
+                        continue
+                    deleted_dirs.append(dir_path)
+                    if outermost_dir != dir_path:
+                        logger.debug("Deleted '%s' with '%s'", dir_path, outermost_dir)
+            else:
+                deleted_dirs = remove_dirs(empty_dirs)
+            deleted_dirs_count += len(deleted_dirs)
+            logger.info(f"Deleted {len(deleted_dirs)} empty dir(s) in '{path_to_scan}'.")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    logger.info(f"Deleted {deleted_dirs_count} dir(s).")
 
-    logger.debug(f"Deleted {deleted_dirs_count} dir(s).")
-    logger.debug("Deleted dirs:")
-    for deleted_dir in deleted_dirs_list:
-        logger.debug(f" - {deleted_dir}")
+
+_DURATION_UNITS = (
+    ('y', 365 * 24 * 60 * 60 * 1_000_000_000),
+    ('mo', 30 * 24 * 60 * 60 * 1_000_000_000),
+    ('d', 24 * 60 * 60 * 1_000_000_000),
+    ('h', 60 * 60 * 1_000_000_000),
+    ('m', 60 * 1_000_000_000),
+    ('s', 1_000_000_000),
+    ('ms', 1_000_000),
+    ('us', 1_000),
+    ('ns', 1),
+)
 
 
 def format_duration_long(duration_seconds: float) -> str:
@@ -98,27 +437,15 @@ def format_duration_long(duration_seconds: float) -> str:
     For durations >= 1m, do not show milliseconds.
     """
     ns = int(duration_seconds * 1_000_000_000)
-    units = [
-        ('y', 365 * 24 * 60 * 60 * 1_000_000_000),
-        ('mo', 30 * 24 * 60 * 60 * 1_000_000_000),
-        ('d', 24 * 60 * 60 * 1_000_000_000),
-        ('h', 60 * 60 * 1_000_000_000),
-        ('m', 60 * 1_000_000_000),
-        ('s', 1_000_000_000),
-        ('ms', 1_000_000),
-        ('us', 1_000),
-        ('ns', 1),
-    ]
-    parts = []
-    for name, factor in units:
+    largest = None
+    for name, factor in _DURATION_UNITS:
         value, ns = divmod(ns, factor)
-        if value:
-            parts.append(f'{value}{name}')
-        if len(parts) == 2:
-            break
-    if not parts:
-        return "0s"
-    return "".join(parts)
+        if not value:
+            continue
+        if largest is not None:
+            return largest + str(value) + name
+        largest = str(value) + name
+    return largest or "0s"
 
 
 def enforce_max_folder_size(log_dir: pathlib.Path, max_bytes: int) -> None:
@@ -129,18 +456,25 @@ def enforce_max_folder_size(log_dir: pathlib.Path, max_bytes: int) -> None:
     if max_bytes is None:
         return
 
-    files = sorted(
-        [f for f in log_dir.glob("*.log*") if f.is_file()],
-        key=lambda f: f.stat().st_mtime
-    )
-
-    total_size = sum(f.stat().st_size for f in files)
+    # One scandir pass; DirEntry caches each file's stat so it is only fetched once
+    files = []
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            if ".log" not in entry.name or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                file_stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            files.append((file_stat.st_mtime, file_stat.st_size, entry.path))
+    files.sort(reverse=True)
+
+    total_size = sum(size for _, size, _ in files)
 
     while total_size > max_bytes and files:
-        oldest = files.pop(0)
+        _, size, oldest = files.pop()
         try:
-            size = oldest.stat().st_size
-            oldest.unlink()
+            os.remove(oldest)
             logger.debug(f'Deleted "{oldest}"')
             total_size -= size
         except Exception:
@@ -148,6 +482,28 @@ def enforce_max_folder_size(log_dir: pathlib.Path, max_bytes: int) -> None:
             continue
 
 
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a 1 MiB buffer and only flushes for errors and on close,
+    instead of issuing a write after every record.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=1 << 20, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
 def setup_logging(
         logger: logging.Logger,
         log_file_path: typing.Union[str, pathlib.Path],
@@ -156,8 +512,11 @@ def setup_logging(
         file_logging_level: int = logging.DEBUG,
         log_message_format: str = "%(asctime)s.%(msecs)03d %(levelname)s [%(funcName)s]: %(message)s",
         date_format: str = "%Y-%m-%d %H:%M:%S"
-) -> None:
-
+) -> logging.handlers.QueueListener:
+    """
+    Log to a file and the console from a background thread, so logging calls only enqueue records.
+    Returns the started listener, which must be stopped to flush the remaining records.
+    """
     log_file_path = pathlib.Path(log_file_path)
     log_dir = log_file_path.parent
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -168,38 +527,58 @@ def setup_logging(
     formatter = logging.Formatter(log_message_format, datefmt=date_format)
 
     # File Handler
-    file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
+    file_handler = _BufferedFileHandler(log_file_path, encoding="utf-8")
     file_handler.setLevel(file_logging_level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    # Hand file records over in batches, flushing early only for errors
+    memory_handler = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=file_handler)
+    memory_handler.setLevel(file_logging_level)
 
     # Console Handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(console_logging_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+    # Queue Handler
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, memory_handler, console_handler, respect_handler_level=True)
+    listener.start()
 
     if max_folder_size_bytes is not None:
         enforce_max_folder_size(log_dir, max_folder_size_bytes)
 
+    return listener
 
-def load_config(file_path: typing.Union[str, pathlib.Path]) -> dict:
-    file_path = pathlib.Path(file_path)
-    if not file_path.exists():
-        raise FileNotFoundError(f'File not found: "{file_path}"')
+
+def load_config(file_path: typing.Union[str, pathlib.Path]) -> Config:
     config = read_toml(file_path)
-    return config
+    scan_workers = config.get("scan_workers", 0)
+    if not isinstance(scan_workers, int) or isinstance(scan_workers, bool) or scan_workers < 0:
+        raise ValueError(f'"scan_workers" must be 0 or a positive whole number, got {scan_workers!r}')
+    # Precompute the ignore rules once so the scan never has to re-derive them
+    return Config(
+        paths_to_scan=tuple(config["paths_to_scan"]),
+        ignore_these_exact_paths=frozenset(path.casefold() for path in config["ignore_these_exact_paths"]),
+        any_part_of_path_to_ignore=compile_ignore_parts(config["any_part_of_path_to_ignore"]),
+        trust_directory_link_count=config.get("trust_directory_link_count", False),
+        scan_workers=scan_workers,
+        batch_trash=config.get("batch_trash", True),
+        use_trash=config.get("use_trash", True),
+        logging=config.get("logging", {})
+    )
 
 
 if __name__ == "__main__":
     error = 0
+    log_listener = None
     try:
         script_name = pathlib.Path(__file__).stem
         config_path = pathlib.Path(f'{script_name}_config.toml')
         # config_path = pathlib.Path("config.toml")
         config = load_config(config_path)
 
-        logging_config = config.get("logging", {})
+        logging_config = config.logging
         console_logging_level = getattr(logging, logging_config.get("console_logging_level", "INFO").upper(), logging.DEBUG)
         file_logging_level = getattr(logging, logging_config.get("file_logging_level", "INFO").upper(), logging.DEBUG)
         log_message_format = logging_config.get("log_message_format", "%(asctime)s.%(msecs)03d %(levelname)s [%(funcName)s]: %(message)s")
@@ -213,7 +592,7 @@ if __name__ == "__main__":
         log_file_name = f'{timestamp}_{script_name}_{pc_name}.log'
         log_file_path = log_dir / log_file_name
 
-        setup_logging(
+        log_listener = setup_logging(
             logger,
             log_file_path,
             max_folder_size_bytes=max_folder_size_bytes,
@@ -235,6 +614,13 @@ if __name__ == "__main__":
         logger.warning(f'A fatal error has occurred: {repr(e)}\n{traceback.format_exc()}')
         error = 1
     finally:
+        if log_listener is not None:
+            log_listener.stop()
+            for handler in log_listener.handlers:
+                target = getattr(handler, "target", None)
+                handler.close()
+                if target is not None:
+                    target.close()
         for handler in logger.handlers:
             handler.close()
         logger.handlers.clear()